@@ -1,19 +1,45 @@
+import functools
+import hashlib
+import json
+import mmap
 import multiprocessing as mp
 import os
+import queue
+import shutil
+import subprocess
 import tarfile
-from hashlib import sha256
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
-import requests
+import urllib3
+from appdirs import user_cache_dir
 
 TAU_MS = "HLTau_B6cont.calavg.tav300s"
 TAU_MS_TAR = f"{TAU_MS}.tar.xz"
+TAU_MS_TAR_HASH_ALGORITHM = "sha256"
 TAU_MS_TAR_HASH = "fc2ce9261817dfd88bbdd244c8e9e58ae0362173938df6ef2a587b1823147f70"
 DATA_URL = (
     f"https://ratt-public-data.s3.af-south-1.amazonaws.com/test-data/{TAU_MS_TAR}"
 )
-DATA_CHUNK_SIZE = 2**20
+DATA_CHUNK_SIZE = 2**22
+DATA_QUEUE_SIZE = 8
+DATA_WRITE_BUFFER_SIZE = 2**23
+
+# External decompressors, keyed on archive suffix.
+# Multi-threaded xz decompression is only possible if the archive
+# was compressed in blocks, e.g. xz -T0 --block-size=16MiB,
+# while zstd archives should be compressed with zstd -T0 --long=27
+DECOMPRESSORS = {
+    ".xz": ["xz", "--decompress", "--stdout", "--threads=0"],
+    ".zst": ["zstd", "--decompress", "--stdout", "--long=31"],
+}
+
+# The "data" extraction filter is available from Python 3.12,
+# and in security releases of earlier versions
+EXTRACT_KWARGS = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -24,83 +50,364 @@ def fully_validate_arrays():
         yield
 
 
-def download_tau_ms(tau_ms_tar):
-    if tau_ms_tar.exists():
-        with open(tau_ms_tar, "rb") as f:
-            digest = sha256()
+def _hash_file(path):
+    """Compute the digest of the file at ``path``"""
+    digest = hashlib.new(TAU_MS_TAR_HASH_ALGORITHM)
+
+    with open(path, "rb", buffering=0) as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Empty files and some filesystems can't be mapped.
+            # Read into a single preallocated buffer and hash slices of it,
+            # avoiding a new bytes object per chunk
+            buffer = bytearray(DATA_CHUNK_SIZE)
+            view = memoryview(buffer)
+
+            while n := f.readinto(buffer):
+                digest.update(view[:n])
+        else:
+            # Hash the entire file in a single call
+            with mm:
+                digest.update(mm)
+
+    return digest
+
+
+class HashingWriter:
+    """Updates a digest with data written to one or more files"""
+
+    def __init__(self, digest, *files):
+        self.digest = digest
+        self.files = files
+
+    def write(self, data):
+        self.digest.update(data)
+
+        for f in self.files:
+            f.write(data)
 
-            while data := f.read(DATA_CHUNK_SIZE):
-                digest.update(data)
+        return len(data)
 
-            if digest.hexdigest() == TAU_MS_TAR_HASH:
+
+def _file_stamp(path):
+    """Identifies the current version of the file at ``path``"""
+    st = os.stat(path)
+
+    return {
+        "st_ino": st.st_ino,
+        "st_mtime_ns": st.st_mtime_ns,
+        "st_size": st.st_size,
+        "digest": TAU_MS_TAR_HASH,
+    }
+
+
+def _write_stamp(path, stamp_path):
+    """Atomically records the stamp of a verified file at ``path``"""
+    tmp_path = stamp_path.with_name(f"{stamp_path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(_file_stamp(path)))
+    os.replace(tmp_path, stamp_path)
+
+
+def download_tau_ms(tau_ms_tar, sink=None):
+    """Verifies ``tau_ms_tar`` if it exists, otherwise downloads it.
+    Downloaded data is also written to ``sink``, if provided"""
+    stamp_path = tau_ms_tar.with_name(f"{tau_ms_tar.name}.stamp")
+
+    if tau_ms_tar.exists():
+        # Skip verification if the file hasn't changed since it was last verified
+        try:
+            if json.loads(stamp_path.read_text()) == _file_stamp(tau_ms_tar):
                 return
+        except (OSError, ValueError):
+            pass
 
+        digest = _hash_file(tau_ms_tar)
+
+        if digest.hexdigest() == TAU_MS_TAR_HASH:
+            _write_stamp(tau_ms_tar, stamp_path)
+            return
+
+        tau_ms_tar.unlink(missing_ok=True)
+        stamp_path.unlink(missing_ok=True)
+        raise ValueError(
+            f"{TAU_MS_TAR_HASH_ALGORITHM} digest mismatch for {tau_ms_tar}. "
+            f"{digest.hexdigest()} != {TAU_MS_TAR_HASH}"
+        )
+    else:
+        chunks = queue.Queue(maxsize=DATA_QUEUE_SIZE)
+        stop = threading.Event()
+
+        # Free list of chunk buffers, reused once the consumer is done with them
+        buffers = queue.Queue()
+
+        for _ in range(DATA_QUEUE_SIZE + 2):
+            buffers.put(bytearray(DATA_CHUNK_SIZE))
+
+        def producer():
+            # Stream the response on a separate thread, so that
+            # network reads overlap with hashing and writing to disk
+            try:
+                http = urllib3.PoolManager()
+                response = http.request("GET", DATA_URL, preload_content=False)
+
+                try:
+                    if response.status != 200:
+                        raise urllib3.exceptions.HTTPError(
+                            f"{response.status} {response.reason} for {DATA_URL}"
+                        )
+
+                    while not stop.is_set():
+                        buffer = buffers.get()
+
+                        if not (n := response.readinto(buffer)):
+                            break
+
+                        chunks.put((buffer, n))
+                finally:
+                    response.release_conn()
+            except BaseException as e:
+                chunks.put(e)
+            else:
+                chunks.put(None)
+
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+
+        try:
+            with open(tau_ms_tar, "wb", buffering=DATA_WRITE_BUFFER_SIZE) as fout:
+                digest = hashlib.new(TAU_MS_TAR_HASH_ALGORITHM)
+                files = [fout] if sink is None else [fout, sink]
+                writer = HashingWriter(digest, *files)
+
+                while (chunk := chunks.get()) is not None:
+                    if isinstance(chunk, BaseException):
+                        raise chunk
+
+                    buffer, n = chunk
+                    writer.write(memoryview(buffer)[:n])
+                    buffers.put(buffer)
+        except BaseException:
+            # Don't leave a partial download in the cache
+            tau_ms_tar.unlink(missing_ok=True)
+            raise
+        finally:
+            # Drain the queue so that the producer can't block on a full queue,
+            # returning buffers so that it can't block on the free list either
+            stop.set()
+
+            while thread.is_alive():
+                try:
+                    chunk = chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                else:
+                    if isinstance(chunk, tuple):
+                        buffers.put(chunk[0])
+
+            thread.join()
+
+        if digest.hexdigest() != TAU_MS_TAR_HASH:
             tau_ms_tar.unlink(missing_ok=True)
             raise ValueError(
-                f"SHA256 digest mismatch for {tau_ms_tar}. "
+                f"{TAU_MS_TAR_HASH_ALGORITHM} digest mismatch for {DATA_URL}. "
                 f"{digest.hexdigest()} != {TAU_MS_TAR_HASH}"
             )
-    else:
-        response = requests.get(DATA_URL, stream=True)
 
-        with open(tau_ms_tar, "wb") as fout:
-            digest = sha256()
+        _write_stamp(tau_ms_tar, stamp_path)
 
-            for data in response.iter_content(chunk_size=DATA_CHUNK_SIZE):
-                digest.update(data)
-                fout.write(data)
 
-            if digest.hexdigest() != TAU_MS_TAR_HASH:
-                raise ValueError(
-                    f"SHA256 digest mismatch for {DATA_URL}. "
-                    f"{digest.hexdigest()} != {TAU_MS_TAR_HASH}"
-                )
+def cached_directory(path, populate):
+    """Populates ``path`` once by calling ``populate`` on a temporary
+    sibling directory, which is then atomically renamed to ``path``"""
+    if path.exists():
+        return path
 
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmpdir = Path(tempfile.mkdtemp(prefix=f"{path.name}.", dir=path.parent))
 
-@pytest.fixture(scope="session")
-def tau_ms_tar():
-    from appdirs import user_cache_dir
+    try:
+        populate(tmpdir)
+
+        try:
+            os.replace(tmpdir, path)
+        except OSError:
+            # Another process populated the cache first
+            if not path.exists():
+                raise
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
 
+    return path
+
+
+@pytest.fixture(scope="session")
+def test_data_cache_dir():
     cache_dir = Path(user_cache_dir("arcae")) / "test-data"
     cache_dir.mkdir(parents=True, exist_ok=True)
-    tau_ms_tar = cache_dir / TAU_MS_TAR
+    return cache_dir
 
+
+@pytest.fixture(scope="session")
+def tau_ms_tar(test_data_cache_dir):
+    tau_ms_tar = test_data_cache_dir / TAU_MS_TAR
     download_tau_ms(tau_ms_tar)
     return tau_ms_tar
 
 
+def extract_tau_ms_members(tar, msdir):
+    """Extracts the Measurement Set in ``tar`` into ``msdir``,
+    skipping any logs and READMEs"""
+
+    def keep(member):
+        name = os.path.normpath(member.name)
+        in_ms = name == TAU_MS or name.startswith(f"{TAU_MS}{os.sep}")
+        return in_ms and not name.endswith((".log", "README"))
+
+    # Iterating over the archive also supports streaming mode
+    members = (m for m in tar if keep(m))
+    tar.extractall(msdir, members=members, **EXTRACT_KWARGS)
+
+
+def extract_tar_stream(source, suffix, msdir):
+    """Extracts the tar archive, compressed as indicated by ``suffix``,
+    read from the ``source`` file object into ``msdir``"""
+    if (args := DECOMPRESSORS.get(suffix)) and (exe := shutil.which(args[0])):
+        args = [exe, *args[1:]]
+
+        with subprocess.Popen(args, stdin=source, stdout=subprocess.PIPE) as proc:
+            with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+                extract_tau_ms_members(tar, msdir)
+
+            # Consume any trailing padding so that the decompressor exits cleanly
+            while proc.stdout.read(DATA_CHUNK_SIZE):
+                pass
+
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, args)
+    elif suffix == ".zst":
+        zstd = pytest.importorskip("zstandard")
+        dctx = zstd.ZstdDecompressor(max_window_size=2**31)
+
+        with dctx.stream_reader(
+            source, read_across_frames=True, closefd=False
+        ) as reader:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                extract_tau_ms_members(tar, msdir)
+    else:
+        # Decompress in a single forward pass over the archive
+        with tarfile.open(fileobj=source, mode="r|*") as tar:
+            extract_tau_ms_members(tar, msdir)
+
+
+def extract_tau_ms(tau_ms_tar, msdir):
+    with open(tau_ms_tar, "rb", buffering=DATA_CHUNK_SIZE) as f:
+        extract_tar_stream(f, Path(tau_ms_tar).suffix, msdir)
+
+
+def download_and_extract_tau_ms(tau_ms_tar, msdir):
+    """Extracts the archive into ``msdir`` while it is
+    being downloaded to ``tau_ms_tar`` on another thread"""
+    rfd, wfd = os.pipe()
+    errors = []
+
+    def download():
+        try:
+            with open(wfd, "wb") as sink:
+                download_tau_ms(tau_ms_tar, sink)
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=download, daemon=True)
+    thread.start()
+
+    try:
+        with open(rfd, "rb", buffering=DATA_CHUNK_SIZE) as source:
+            extract_tar_stream(source, Path(tau_ms_tar).suffix, msdir)
+
+            # Let the download run to completion
+            while source.read(DATA_CHUNK_SIZE):
+                pass
+    except BaseException:
+        # Closing the pipe above stops a download that is still writing to it
+        thread.join()
+
+        # Download failures (e.g. a digest mismatch) take precedence over
+        # the extraction failures they cause, but not the other way around
+        if errors and not isinstance(errors[0], BrokenPipeError):
+            raise errors[0]
+
+        raise
+
+    thread.join()
+
+    if errors:
+        raise errors[0]
+
+
 @pytest.fixture(scope="session")
-def tau_ms(tau_ms_tar, tmp_path_factory):
-    msdir = tmp_path_factory.mktemp("tau-ms")
+def tau_ms(request, test_data_cache_dir):
+    tau_ms_tar = test_data_cache_dir / TAU_MS_TAR
+    extract_dir = test_data_cache_dir / "extracted" / TAU_MS_TAR_HASH
 
-    with tarfile.open(tau_ms_tar) as tar:
-        tar.extractall(msdir)
+    # Only request (and verify) the archive on a cache miss,
+    # downloading and extracting it concurrently if it's absent
+    def extract(msdir):
+        if tau_ms_tar.exists():
+            extract_tau_ms(request.getfixturevalue("tau_ms_tar"), msdir)
+        else:
+            download_and_extract_tau_ms(tau_ms_tar, msdir)
 
-    return str(msdir / TAU_MS)
+    return str(cached_directory(extract_dir, extract) / TAU_MS)
 
 
 @pytest.fixture(scope="session")
-def partitioned_dataset(tau_ms, tmp_path_factory):
-    import pyarrow as pa
-    import pyarrow.dataset as pad
+def partitioned_dataset(tau_ms, test_data_cache_dir):
+    dsdir = test_data_cache_dir / "partitioned" / f"{TAU_MS_TAR_HASH}-parquet-v3"
+
+    return cached_directory(dsdir, functools.partial(write_partitioned_dataset, tau_ms))
 
-    import arcae
 
-    dsdir = tmp_path_factory.mktemp("partition-dataset")
+def write_partitioned_dataset(tau_ms, dsdir):
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    import arcae
 
     AT = arcae.table(tau_ms).to_arrow()
-    partition_fields = [AT.schema.field(c) for c in ("FIELD_ID", "DATA_DESC_ID")]
-    partition = pad.partitioning(pa.schema(partition_fields), flavor="hive")
-    pad.write_dataset(
-        AT,
-        dsdir,
-        partitioning=partition,
-        max_rows_per_group=25000,
-        max_rows_per_file=25000,
-        format="parquet",
-    )
+    partition_columns = ["FIELD_ID", "DATA_DESC_ID"]
+    partitions = AT.group_by(partition_columns).aggregate([]).to_pylist()
+    rows_per_file = 25000
+
+    def write_file(table, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(
+            table,
+            path,
+            row_group_size=rows_per_file,
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+        )
+
+    # Write hive partitions directly, Arrow releases the GIL during writes
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = []
+
+        for partition in partitions:
+            mask = functools.reduce(
+                pc.and_, (pc.equal(AT[c], v) for c, v in partition.items())
+            )
+            table = AT.filter(mask).drop_columns(partition_columns)
+            pdir = dsdir.joinpath(*(f"{c}={v}" for c, v in partition.items()))
 
-    return dsdir
+            for i, start in enumerate(range(0, len(table), rows_per_file)):
+                file_table = table.slice(start, rows_per_file)
+                path = pdir / f"part-{i}.parquet"
+                futures.append(pool.submit(write_file, file_table, path))
+
+        for future in futures:
+            future.result()
 
 
 def generate_sorting_table(path):
@@ -145,150 +452,165 @@ def generate_sorting_table(path):
     return table_name
 
 
-@pytest.fixture
-def sorting_table(tmp_path_factory):
+@pytest.fixture(scope="session")
+def sorting_table(casa_pool, tmp_path_factory):
     return casa_table_at_path(
-        generate_sorting_table, tmp_path_factory.mktemp("column_cases")
+        casa_pool, generate_sorting_table, tmp_path_factory.mktemp("column_cases")
     )
 
 
-def generate_column_cases_table(path):
-    import numpy as np
-    import pyrap.tables as pt
-
-    # Table descriptor
-    table_desc = [
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "VARIABLE column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "ndim": 3,
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "int",
-            },
-            "name": "VARIABLE",
+# Column descriptors of the column cases table
+COLUMN_CASES_DESC = (
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "VARIABLE column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "ndim": 3,
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "int",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "VARIABLE_STRING column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "ndim": 3,
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "string",
-            },
-            "name": "VARIABLE_STRING",
+        "name": "VARIABLE",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "VARIABLE_STRING column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "ndim": 3,
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "string",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "FIXED column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "ndim": 2,
-                "shape": [2, 4],
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "int",
-            },
-            "name": "FIXED",
+        "name": "VARIABLE_STRING",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "FIXED column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "ndim": 2,
+            "shape": [2, 4],
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "int",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "FIXED_STRING column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "ndim": 2,
-                "shape": [2, 4],
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "string",
-            },
-            "name": "FIXED_STRING",
+        "name": "FIXED",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "FIXED_STRING column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "ndim": 2,
+            "shape": [2, 4],
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "string",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "SCALAR column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "int",
-            },
-            "name": "SCALAR",
+        "name": "FIXED_STRING",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "SCALAR column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "int",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "SCALAR_STRING column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "maxlen": 0,
-                "option": 0,
-                "valueType": "string",
-            },
-            "name": "SCALAR_STRING",
+        "name": "SCALAR",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "SCALAR_STRING column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "maxlen": 0,
+            "option": 0,
+            "valueType": "string",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "UNCONSTRAINED column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "maxlen": 0,
-                "ndim": -1,
-                "option": 0,
-                "valueType": "int",
-            },
-            "name": "UNCONSTRAINED",
+        "name": "SCALAR_STRING",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "UNCONSTRAINED column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "maxlen": 0,
+            "ndim": -1,
+            "option": 0,
+            "valueType": "int",
         },
-        {
-            "desc": {
-                "_c_order": True,
-                "comment": "UNCONSTRAINED_SAME_NDIM column",
-                "dataManagerGroup": "",
-                "dataManagerType": "",
-                "keywords": {},
-                "maxlen": 0,
-                "ndim": -1,
-                "option": 0,
-                "valueType": "int",
-            },
-            "name": "UNCONSTRAINED_SAME_NDIM",
+        "name": "UNCONSTRAINED",
+    },
+    {
+        "desc": {
+            "_c_order": True,
+            "comment": "UNCONSTRAINED_SAME_NDIM column",
+            "dataManagerGroup": "",
+            "dataManagerType": "",
+            "keywords": {},
+            "maxlen": 0,
+            "ndim": -1,
+            "option": 0,
+            "valueType": "int",
         },
-    ]
+        "name": "UNCONSTRAINED_SAME_NDIM",
+    },
+)
 
-    table_desc = pt.maketabdesc(table_desc)
+
+@functools.cache
+def column_cases_tabledesc():
+    import pyrap.tables as pt
+
+    return pt.maketabdesc(list(COLUMN_CASES_DESC))
+
+
+def generate_column_cases_table(path):
+    import numpy as np
+    import pyrap.tables as pt
+
+    # Computed once per casacore process
+    table_desc = column_cases_tabledesc()
     table_name = os.path.join(path, "test.table")
     nrow = 3
 
     with pt.table(table_name, table_desc, nrow=nrow, ack=False) as T:
-        for i in range(nrow):
-            T.putcell("VARIABLE", i, np.full((3, 1 + i, 2), i))
-            T.putcell("FIXED", i, np.full((2, 4), i))
-            T.putcell("UNCONSTRAINED_SAME_NDIM", i, np.full((3, 1 + i, 2), i))
-            T.putcell("SCALAR", i, i)
+        # Fixed shape and scalar columns can be written in a single call
+        row = np.arange(nrow)
+        T.putcol("FIXED", np.broadcast_to(row[:, None, None], (nrow, 2, 4)))
+        T.putcol("SCALAR", row)
 
-            T.putcell("VARIABLE_STRING", i, np.full((3, 1 + i, 2), str(i)))
-            T.putcell("FIXED_STRING", i, np.full((2, 4), str(i)))
-            T.putcell("SCALAR_STRING", i, str(i))
+        row_str = row.astype(str)
+        T.putcol("FIXED_STRING", np.broadcast_to(row_str[:, None, None], (nrow, 2, 4)))
+        T.putcol("SCALAR_STRING", list(row_str))
 
-        T.putcell("UNCONSTRAINED", 0, np.full((2, 3, 4), 0))
-        T.putcell("UNCONSTRAINED", 1, np.full((4, 3), 1))
+        for i in range(nrow):
+            # casacore copies cell data, so broadcast views suffice
+            shape = (3, 1 + i, 2)
+            T.putcell("VARIABLE", i, np.broadcast_to(i, shape))
+            T.putcell("UNCONSTRAINED_SAME_NDIM", i, np.broadcast_to(i, shape))
+            T.putcell("VARIABLE_STRING", i, np.broadcast_to(str(i), shape))
+
+        T.putcell("UNCONSTRAINED", 0, np.broadcast_to(0, (2, 3, 4)))
+        T.putcell("UNCONSTRAINED", 1, np.broadcast_to(1, (4, 3)))
         T.putcell("UNCONSTRAINED", 2, 2)
 
         for i in range(nrow):  # Sanity check
@@ -297,21 +619,44 @@ def generate_column_cases_table(path):
     return table_name
 
 
-def casa_table_at_path(factory, *args):
-    with mp.get_context("spawn").Pool(1) as pool:
-        try:
-            return pool.apply_async(factory, args).get()
-        except ImportError as e:
-            pytest.importorskip(e.name)
+@pytest.fixture(scope="session")
+def casa_pool():
+    # python-casacore is only imported in a spawned process,
+    # which is reused by all fixtures for the test session.
+    # Don't fork: the autouse fully_validate_arrays fixture has already
+    # loaded arcae's casacore libraries into this process, which would
+    # then conflict with python-casacore's in the child
+    # (https://github.com/ratt-ru/arcae/issues/72)
+    pool = mp.get_context("spawn").Pool(1)
 
+    try:
+        yield pool
+    finally:
+        pool.close()
+        pool.join()
 
-@pytest.fixture
-def column_case_table(tmp_path_factory):
+
+def casa_table_at_path(pool, factory, *args):
+    try:
+        return pool.apply_async(factory, args).get()
+    except ImportError as e:
+        pytest.importorskip(e.name)
+
+
+@pytest.fixture(scope="session")
+def column_case_table_template(casa_pool, tmp_path_factory):
     return casa_table_at_path(
-        generate_column_cases_table, tmp_path_factory.mktemp("column_cases")
+        casa_pool, generate_column_cases_table, tmp_path_factory.mktemp("column_cases")
     )
 
 
+@pytest.fixture
+def column_case_table(column_case_table_template, tmp_path_factory):
+    # Some tests add columns, so provide each test with a copy
+    table_name = tmp_path_factory.mktemp("column_cases") / "test.table"
+    return str(shutil.copytree(column_case_table_template, table_name))
+
+
 def generate_complex_case_table(path):
     import numpy as np
     import pyrap.tables as pt
@@ -340,15 +685,15 @@ def generate_complex_case_table(path):
 
     with pt.table(table_name, table_desc, nrow=nrow, ack=False) as T:
         for i in range(nrow):
-            T.putcell("COMPLEX", i, np.full((2, 4), i))
+            T.putcell("COMPLEX", i, np.broadcast_to(i, (2, 4)))
 
     return table_name
 
 
-@pytest.fixture
-def complex_case_table(tmp_path_factory):
+@pytest.fixture(scope="session")
+def complex_case_table(casa_pool, tmp_path_factory):
     return casa_table_at_path(
-        generate_complex_case_table, tmp_path_factory.mktemp("complex_cases")
+        casa_pool, generate_complex_case_table, tmp_path_factory.mktemp("complex_cases")
     )
 
 
@@ -448,9 +793,9 @@ def generate_getcol_table(path):
 
 
 @pytest.fixture
-def getcol_table(tmp_path_factory):
+def getcol_table(casa_pool, tmp_path_factory):
     return casa_table_at_path(
-        generate_getcol_table, tmp_path_factory.mktemp("getcol_cases")
+        casa_pool, generate_getcol_table, tmp_path_factory.mktemp("getcol_cases")
     )
 
 
@@ -512,7 +857,10 @@ def generate_ramp_ms(path, dims):
 
 
 @pytest.fixture(scope="session", params=[{"row": NROW, "chan": NCHAN, "corr": NCORR}])
-def ramp_ms(request, tmp_path_factory):
+def ramp_ms(request, casa_pool, tmp_path_factory):
     return casa_table_at_path(
-        generate_ramp_ms, tmp_path_factory.mktemp("generate_ramp_ms"), request.param
+        casa_pool,
+        generate_ramp_ms,
+        tmp_path_factory.mktemp("generate_ramp_ms"),
+        request.param,
     )